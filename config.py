@@ -9,6 +9,8 @@ BASE_DIR =Path (__file__ ).parent
 DATA_DIR =BASE_DIR /"data"
 DOCS_DIR =DATA_DIR /"documents"
 DB_DIR =DATA_DIR /"vector_db"
+INDEX_VERSIONS_DIR =DB_DIR /"versions"
+ACTIVE_INDEX_FILE =DB_DIR /"active_version.json"
 
 
 GEMINI_API_KEY =os .getenv ("GEMINI_API_KEY","")
@@ -20,5 +22,25 @@ TOP_K =5
 SIMILARITY_THRESHOLD =0.65 
 
 
+COLLECTION_NAME ="egov_docs"
+INDEX_KEEP_VERSIONS =2 
+INDEX_CHECK_INTERVAL =5.0 
+
+
+COMPRESSION_ENABLED =os .getenv ("COMPRESSION_ENABLED","0")=="1"
+COMPRESSION_METHOD ="pca"
+COMPRESSION_DIM =128 
+COMPRESSION_SHORTLIST =50 
+
+
+HNSW_SPACE ="cosine"
+HNSW_M =16 
+HNSW_CONSTRUCTION_EF =100 
+HNSW_SEARCH_EF =10 
+HNSW_BATCH_SIZE =100 
+HNSW_SYNC_THRESHOLD =1000 
+HNSW_TARGET_RECALL =0.95 
+
+
 DOCS_DIR .mkdir (parents =True ,exist_ok =True )
 DB_DIR .mkdir (parents =True ,exist_ok =True )
@@ -4,7 +4,11 @@
 from pathlib import Path 
 from src .embedder import Embedder 
 from src .vector_store import VectorStore 
-from config import DOCS_DIR ,CHUNK_SIZE ,CHUNK_OVERLAP 
+from src .index_versions import (
+new_version ,version_path ,publish_version ,discard_version ,cleanup_old_versions 
+)
+from src .compression import evaluate_recall 
+from config import DOCS_DIR ,CHUNK_SIZE ,CHUNK_OVERLAP ,COMPRESSION_ENABLED 
 import re 
 
 
@@ -90,10 +94,39 @@ def main ():
     print (f"✅ Создано {len(embeddings)} эмбеддингов\n")
 
 
-    print ("💾 Сохранение в векторную базу...")
-    store =VectorStore ()
-    store .create_collection ()
-    store .add_documents (all_chunks ,embeddings ,all_metadatas )
+    version =new_version ()
+    print (f"💾 Сохранение в векторную базу (версия {version})...")
+    store =None 
+    try :
+        store =VectorStore (version_path (version ))
+        store .create_collection ()
+        store .add_documents (all_chunks ,embeddings ,all_metadatas )
+
+        if COMPRESSION_ENABLED :
+            print ("\n🗜️ Сжатие векторов...")
+            index =store .build_compressed_index (embeddings )
+            report =evaluate_recall (index ,embeddings )
+            print (f"📉 Потеря полноты относительно точного поиска: {1 -report['recall']:.1%} "
+            f"(recall {report['recall']:.3f}, {report['avg_latency_ms']:.2f} мс/запрос)")
+
+
+        print ("\n🔎 Проверка новой версии...")
+        if not store .validate (len (all_chunks ),embeddings [0 ]):
+            store .close ()
+            discard_version (version )
+            print ("❌ Версия не прошла проверку, активный индекс не изменен")
+            return 
+
+        store .close ()
+        publish_version (version )
+    except Exception :
+        if store is not None :
+            store .close ()
+        discard_version (version )
+        print ("❌ Ошибка при сборке версии, активный индекс не изменен")
+        raise 
+
+    cleanup_old_versions ()
 
     print ("\n✅ Векторная база готова!")
     print ("Теперь запусти: python app.py\n")
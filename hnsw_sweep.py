@@ -0,0 +1,155 @@
+"""
+Подбор параметров HNSW: сборка коллекции с разными M / ef и сравнение
+с точным поиском на эмбеддингах нашей базы знаний
+"""
+from itertools import product
+from pathlib import Path
+import shutil
+import tempfile
+import time
+import numpy as np
+from src .embedder import Embedder
+from src .vector_store import VectorStore
+from create_db import load_document ,chunk_text
+from config import DOCS_DIR ,TOP_K ,HNSW_TARGET_RECALL ,COMPRESSION_ENABLED
+
+
+M_VALUES =[8 ,16 ,32 ]
+CONSTRUCTION_EF_VALUES =[50 ,100 ,200 ]
+SEARCH_EF_VALUES =[10 ,50 ,100 ]
+N_QUERIES =100
+
+
+def dir_size (path :Path )->int :
+    """Размер директории на диске в байтах"""
+    return sum (f .stat ().st_size for f in Path (path ).rglob ("*")if f .is_file ())
+
+
+def exact_neighbors (vectors :np .ndarray ,query_ids :np .ndarray ,top_k :int )->list :
+    """Точный поиск по косинусной близости перебором (без самого запроса)"""
+    normed =vectors /np .linalg .norm (vectors ,axis =1 ,keepdims =True )
+    scores =normed [query_ids ]@normed .T
+    return [
+    set ([i for i in np .argsort (-row )[:top_k +1 ].tolist ()if i !=qid ][:top_k ])
+    for qid ,row in zip (query_ids .tolist (),scores )
+    ]
+
+
+def measure_search (store :VectorStore ,queries ,query_ids ,exact ,search_ef :int )->dict :
+    """Задержка и полнота поиска при заданном search_ef"""
+    store .set_search_ef (search_ef )
+    store .search (queries [0 ],top_k =TOP_K +1 )
+
+    latencies =[]
+    hits =0
+    for query ,qid ,expected in zip (queries ,query_ids .tolist (),exact ):
+        start =time .perf_counter ()
+        results =store .search (query ,top_k =TOP_K +1 )
+        latencies .append (time .perf_counter ()-start )
+
+        found =[int (m ['chunk_id'])for m in results ['metadatas']]
+        found =[i for i in found if i !=qid ][:TOP_K ]
+        hits +=len (expected .intersection (found ))
+
+    return {
+    'search_ef':search_ef ,
+    'p50_ms':float (np .percentile (latencies ,50 ))*1000 ,
+    'p95_ms':float (np .percentile (latencies ,95 ))*1000 ,
+    'recall':hits /(len (queries )*TOP_K )
+    }
+
+
+def run_setting (chunks ,embeddings ,metadatas ,queries ,query_ids ,exact ,m :int ,construction_ef :int )->list :
+    """
+    Собрать коллекцию с M / construction_ef один раз (batch и sync - как в
+    проде) и измерить ее при каждом search_ef; для каждого значения клиент
+    переоткрывается, иначе загруженный индекс ищет со старым ef. Размер на
+    диске считается после закрытия клиента, когда индекс сброшен на диск.
+    """
+    tmp_dir =Path (tempfile .mkdtemp (prefix ="hnsw_sweep_"))
+    try :
+        store =VectorStore (tmp_dir )
+        store .create_collection (m =m ,construction_ef =construction_ef ,search_ef =SEARCH_EF_VALUES [0 ])
+
+        start =time .perf_counter ()
+        store .add_documents (chunks ,embeddings ,metadatas )
+        build_time =time .perf_counter ()-start
+        store .close ()
+
+        store =VectorStore (tmp_dir )
+        store .load_collection ()
+        rows =[]
+        for search_ef in SEARCH_EF_VALUES :
+            rows .append (measure_search (store ,queries ,query_ids ,exact ,search_ef ))
+
+        recalls ={row ['recall']for row in rows }
+        if len (recalls )==1 and min (recalls )<1.0 :
+            print ("⚠️ Полнота не меняется с search_ef - проверь, что индекс переоткрывается с новым ef")
+
+        store .close ()
+        size_mb =dir_size (tmp_dir )/1024 /1024 
+
+        return [
+        {'m':m ,'construction_ef':construction_ef ,'build_s':build_time ,'size_mb':size_mb ,**row }
+        for row in rows 
+        ]
+    finally :
+        shutil .rmtree (tmp_dir ,ignore_errors =True )
+
+
+def recommend (results :list ,target_recall :float =HNSW_TARGET_RECALL )->dict :
+    """Самая быстрая настройка с полнотой не ниже целевой"""
+    good =[r for r in results if r ['recall']>=target_recall ]
+    if not good :
+        return max (results ,key =lambda r :(r ['recall'],-r ['p50_ms']))
+    return min (good ,key =lambda r :(r ['p50_ms'],r ['size_mb'],r ['build_s']))
+
+
+def main ():
+    print ("🧪 Подбор параметров HNSW\n")
+
+    if COMPRESSION_ENABLED :
+        print ("❌ Включено сжатие векторов (COMPRESSION_ENABLED=1): поиск идет по сжатому")
+        print ("   индексу и не использует HNSW, поэтому подбор его параметров не имеет смысла.")
+        return
+
+    chunks =[]
+    metadatas =[]
+    for doc in DOCS_DIR .glob ("*.md"):
+        for chunk in chunk_text (load_document (doc )):
+            metadatas .append ({'source':doc .name ,'chunk_id':len (chunks )})
+            chunks .append (chunk )
+
+    if not chunks :
+        print ("❌ Не найдено документов в",DOCS_DIR )
+        return
+
+    print (f"📊 Чанков: {len(chunks)}\n")
+    embeddings =Embedder ().embed_batch (chunks )
+
+    vectors =np .asarray (embeddings ,dtype =np .float32 )
+    rng =np .random .default_rng (0 )
+    query_ids =rng .choice (len (vectors ),size =min (N_QUERIES ,len (vectors )),replace =False )
+    queries =vectors [query_ids ].tolist ()
+    exact =exact_neighbors (vectors ,query_ids ,TOP_K )
+
+    results =[]
+    for m ,construction_ef in product (M_VALUES ,CONSTRUCTION_EF_VALUES ):
+        print (f"\n⚙️  M={m}, construction_ef={construction_ef}")
+        results .extend (run_setting (chunks ,embeddings ,metadatas ,queries ,query_ids ,exact ,m ,construction_ef ))
+
+    print ("\n📋 Результаты:")
+    print (f"{'M':>4} {'c_ef':>5} {'s_ef':>5} {'build, s':>9} {'size, MB':>9} {'p50, ms':>8} {'p95, ms':>8} {'recall':>7}")
+    for r in results :
+        print (f"{r['m']:>4} {r['construction_ef']:>5} {r['search_ef']:>5} {r['build_s']:>9.2f} "
+        f"{r['size_mb']:>9.2f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['recall']:>7.3f}")
+
+    best =recommend (results )
+    print (f"\n✅ Рекомендация (целевая полнота {HNSW_TARGET_RECALL:.0%}), укажи в config.py:")
+    print (f"HNSW_M ={best['m']}")
+    print (f"HNSW_CONSTRUCTION_EF ={best['construction_ef']}")
+    print (f"HNSW_SEARCH_EF ={best['search_ef']}\n")
+
+
+if __name__ =="__main__":
+    main ()
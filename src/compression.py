@@ -0,0 +1,142 @@
+"""
+Сжатое хранение векторов: понижение размерности (PCA или усечение
+Matryoshka) и int8-квантование для первичного отбора, с пересчетом
+короткого списка по полноточным векторам
+"""
+from pathlib import Path
+from typing import Dict ,List ,Tuple
+import time
+import numpy as np
+from config import COMPRESSION_DIM ,COMPRESSION_METHOD ,COMPRESSION_SHORTLIST ,TOP_K
+
+
+def _normalize (vectors :np .ndarray )->np .ndarray :
+    """Нормировать векторы для косинусной близости"""
+    norms =np .linalg .norm (vectors ,axis =-1 ,keepdims =True )
+    return vectors /np .maximum (norms ,1e-12 )
+
+
+class CompressedIndex :
+    """Индекс на int8-векторах пониженной размерности"""
+
+    INDEX_FILE ="compressed.npz"
+    VECTORS_FILE ="full_vectors.npy"
+
+    def __init__ (self ,components :np .ndarray ,scales :np .ndarray ,codes :np .ndarray ,full_vectors :np .ndarray ):
+        self .components =components
+        self .scales =scales
+        self .codes =codes
+        self .full_vectors =full_vectors
+
+    @classmethod
+    def fit (cls ,embeddings :List [List [float ]],dim :int =COMPRESSION_DIM ,method :str =COMPRESSION_METHOD )->"CompressedIndex":
+        """Обучить проекцию на корпусе и квантовать векторы"""
+        full =_normalize (np .asarray (embeddings ,dtype =np .float32 ))
+        n ,full_dim =full .shape
+        dim =min (dim ,full_dim )
+
+        if method =="pca":
+
+
+            dim =min (dim ,n )
+            _ ,_ ,vt =np .linalg .svd (full ,full_matrices =False )
+            components =vt [:dim ]
+        elif method =="matryoshka":
+            components =np .eye (full_dim ,dtype =np .float32 )[:dim ]
+        else :
+            raise ValueError (f"Неизвестный метод сжатия: {method}")
+
+        reduced =full @components .T
+        scales =np .abs (reduced ).max (axis =0 )/127.0
+        scales =np .maximum (scales ,1e-12 ).astype (np .float32 )
+        codes =np .clip (np .round (reduced /scales ),-127 ,127 ).astype (np .int8 )
+
+        return cls (components .astype (np .float32 ),scales ,codes ,full )
+
+    @classmethod
+    def exists (cls ,path :Path )->bool :
+        """Есть ли сжатый индекс в директории базы"""
+        return (Path (path )/cls .INDEX_FILE ).exists ()
+
+    def save (self ,path :Path ):
+        """Сохранить индекс рядом с коллекцией"""
+        path =Path (path )
+        np .savez (
+        path /self .INDEX_FILE ,
+        components =self .components ,
+        scales =self .scales ,
+        codes =self .codes
+        )
+        np .save (path /self .VECTORS_FILE ,np .asarray (self .full_vectors ,dtype =np .float32 ))
+
+    @classmethod
+    def load (cls ,path :Path )->"CompressedIndex":
+        """Загрузить индекс; полноточные векторы читаются с диска по требованию"""
+        path =Path (path )
+        with np .load (path /cls .INDEX_FILE )as data :
+            components =data ['components']
+            scales =data ['scales']
+            codes =data ['codes']
+        full_vectors =np .load (path /cls .VECTORS_FILE ,mmap_mode ='r')
+        return cls (components ,scales ,codes ,full_vectors )
+
+    def search (self ,query_embedding :List [float ],top_k :int =TOP_K ,shortlist :int =COMPRESSION_SHORTLIST )->Tuple [List [int ],List [float ]]:
+        """Найти top_k векторов: отбор по int8, пересчет по полной точности"""
+        query =_normalize (np .asarray (query_embedding ,dtype =np .float32 ))
+        n =len (self .codes )
+        top_k =min (top_k ,n )
+        shortlist =min (max (shortlist ,top_k ),n )
+        if top_k ==0 :
+            return [],[]
+
+
+        weights =(self .components @query )*self .scales
+        approx =self .codes @weights
+        candidates =np .argpartition (-approx ,shortlist -1 )[:shortlist ]
+        candidates .sort ()
+
+        exact =np .asarray (self .full_vectors [candidates ])@query
+        order =np .argsort (-exact )[:top_k ]
+
+        indices =candidates [order ].tolist ()
+        distances =(1.0 -exact [order ]).tolist ()
+        return indices ,distances
+
+    def memory_stats (self )->Dict [str ,int ]:
+        """Размер сжатых и полноточных векторов в байтах"""
+        return {
+        'compressed_bytes':int (self .codes .nbytes +self .components .nbytes +self .scales .nbytes ),
+        'full_bytes':int (self .full_vectors .shape [0 ]*self .full_vectors .shape [1 ]*4 )
+        }
+
+
+def evaluate_recall (index :CompressedIndex ,embeddings :List [List [float ]],top_k :int =TOP_K ,
+shortlist :int =COMPRESSION_SHORTLIST ,n_queries :int =200 ,seed :int =0 )->Dict [str ,float ]:
+    """
+    Сравнить сжатый поиск с точным поиском по полным векторам. Запросами
+    служат векторы корпуса; сам вектор-запрос исключается из обоих списков,
+    чтобы его тривиальное совпадение не завышало полноту.
+    """
+    full =_normalize (np .asarray (embeddings ,dtype =np .float32 ))
+    n =len (full )
+    top_k =min (top_k ,n -1 )
+    rng =np .random .default_rng (seed )
+    query_ids =rng .choice (n ,size =min (n_queries ,n ),replace =False )
+
+    hits =0
+    elapsed =0.0
+    for qid in query_ids :
+        query =full [qid ]
+        exact =[i for i in np .argsort (-(full @query ))[:top_k +1 ].tolist ()if i !=qid ][:top_k ]
+
+        start =time .perf_counter ()
+        found ,_ =index .search (query ,top_k =top_k +1 ,shortlist =shortlist )
+        elapsed +=time .perf_counter ()-start
+
+        found =[i for i in found if i !=qid ][:top_k ]
+        hits +=len (set (exact ).intersection (found ))
+
+    return {
+    'recall':hits /(len (query_ids )*top_k )if top_k >0 else 1.0 ,
+    'avg_latency_ms':elapsed /len (query_ids )*1000 if len (query_ids )else 0.0
+    }
@@ -0,0 +1,103 @@
+"""
+Версионирование векторной базы: сборка в отдельную директорию,
+атомарное переключение указателя и удаление старых версий
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import List ,Optional
+from config import DB_DIR ,INDEX_VERSIONS_DIR ,ACTIVE_INDEX_FILE ,INDEX_KEEP_VERSIONS
+
+
+def new_version ()->str :
+    """Сгенерировать имя новой версии индекса"""
+    return datetime .now ().strftime ("v%Y%m%d_%H%M%S_%f")
+
+
+def version_path (version :str )->Path :
+    """Путь к директории версии"""
+    return INDEX_VERSIONS_DIR /version
+
+
+PUBLISHED_MARKER ="PUBLISHED"
+
+
+def list_versions ()->List [str ]:
+    """Список собранных версий, от старых к новым"""
+    if not INDEX_VERSIONS_DIR .exists ():
+        return []
+    return sorted (p .name for p in INDEX_VERSIONS_DIR .iterdir ()if p .is_dir ())
+
+
+def list_published_versions ()->List [str ]:
+    """Версии, которые когда-либо публиковались, от старых к новым по времени публикации"""
+    published =[]
+    for version in list_versions ():
+        marker =version_path (version )/PUBLISHED_MARKER 
+        if marker .exists ():
+            published .append ((marker .read_text (encoding ='utf-8').strip (),version ))
+    return [version for _ ,version in sorted (published )]
+
+
+def get_active_version ()->Optional [str ]:
+    """Прочитать текущую активную версию (None - старая база без версий)"""
+    try :
+        with open (ACTIVE_INDEX_FILE ,'r',encoding ='utf-8')as f :
+            return json .load (f ).get ('version')
+    except (FileNotFoundError ,json .JSONDecodeError ):
+        return None
+
+
+def index_path (version :Optional [str ])->Path :
+    """Путь к базе данной версии (None - старая база без версий)"""
+    if version is None :
+        return DB_DIR
+    return version_path (version )
+
+
+def get_active_path ()->Path :
+    """Путь к базе, которую должны использовать запросы"""
+    return index_path (get_active_version ())
+
+
+def publish_version (version :str ):
+    """Атомарно сделать версию активной"""
+    if not version_path (version ).is_dir ():
+        raise ValueError (f"Версия индекса не найдена: {version}")
+
+    published_at =datetime .now ().isoformat ()
+    (version_path (version )/PUBLISHED_MARKER ).write_text (published_at ,encoding ='utf-8')
+
+    tmp_file =ACTIVE_INDEX_FILE .with_suffix (".tmp")
+    with open (tmp_file ,'w',encoding ='utf-8')as f :
+        json .dump ({
+        'version':version ,
+        'published_at':published_at 
+        },f )
+        f .flush ()
+        os .fsync (f .fileno ())
+
+
+    os .replace (tmp_file ,ACTIVE_INDEX_FILE )
+    print (f"✅ Активная версия индекса: {version}")
+
+
+def discard_version (version :str ):
+    """Удалить директорию версии"""
+    shutil .rmtree (version_path (version ),ignore_errors =True )
+
+
+def cleanup_old_versions (keep :int =INDEX_KEEP_VERSIONS ):
+    """
+    Удалить старые опубликованные версии, оставив активную и `keep - 1`
+    опубликованных перед ней. Неопубликованные версии (в том числе те, что
+    сейчас собирает другой запуск create_db) не трогаются.
+    """
+    active =get_active_version ()
+    retired =[version for version in list_published_versions ()if version !=active ]
+
+    for version in retired [:max (len (retired )-(keep -1 ),0 )]:
+        discard_version (version )
+        print (f"🗑️ Удалена старая версия индекса: {version}")
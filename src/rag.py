@@ -1,8 +1,11 @@
 from src .embedder import Embedder 
 from src .generator import Generator 
 from src .vector_store import VectorStore 
-from config import TOP_K ,SIMILARITY_THRESHOLD 
+from src .index_versions import get_active_version ,index_path 
+from config import TOP_K ,SIMILARITY_THRESHOLD ,INDEX_CHECK_INTERVAL 
 from typing import Dict ,List 
+import threading 
+import time 
 
 
 class RAGSystem :
@@ -14,23 +17,108 @@ class RAGSystem :
 
         self .embedder =Embedder ()
         self .generator =Generator ()
-        self .store =VectorStore ()
 
+        self .index_version =get_active_version ()
+        self .store =VectorStore (index_path (self .index_version ))
         self .store .load_collection ()
 
+        self ._swap_lock =threading .Lock ()
+        self ._refresh_lock =threading .Lock ()
+        self ._store_refs ={}
+        self ._retired_stores =[]
+        self ._failed_version =None 
+        self ._last_index_check =time .monotonic ()
+
         print ("✅ RAG система готова!\n")
 
+    def refresh_index (self ,force :bool =False )->bool :
+        """
+        Переключиться на новую опубликованную версию индекса, если она есть.
+        Модель эмбеддингов не перезагружается; текущие запросы дорабатывают
+        на старом хранилище, после чего оно закрывается. Версия, которую не
+        удалось загрузить, больше не проверяется (кроме force=True), пока не
+        будет опубликована другая.
+        """
+        now =time .monotonic ()
+        if not force and now -self ._last_index_check <INDEX_CHECK_INTERVAL :
+            return False 
+
+
+        if not self ._refresh_lock .acquire (blocking =False ):
+            return False 
+
+        try :
+            self ._last_index_check =now 
+            version =get_active_version ()
+            if version ==self .index_version :
+                return False 
+            if version ==self ._failed_version and not force :
+                return False 
+
+            store =None 
+            try :
+                store =VectorStore (index_path (version ))
+                store .load_collection ()
+            except Exception as e :
+
+
+                if store is not None :
+                    store .close ()
+                self ._failed_version =version 
+                print (f"⚠️ Не удалось загрузить версию индекса {version}: {e}")
+                return False 
+
+            with self ._swap_lock :
+                old_store =self .store 
+                self .store =store 
+                self .index_version =version 
+                if self ._store_refs .get (id (old_store ),0 )==0 :
+                    old_store .close ()
+                else :
+                    self ._retired_stores .append (old_store )
+
+            print (f"🔄 Индекс переключен на версию: {version}")
+            return True 
+        finally :
+            self ._refresh_lock .release ()
+
+    def _acquire_store (self )->VectorStore :
+        """Взять текущее хранилище на время запроса"""
+        with self ._swap_lock :
+            store =self .store 
+            self ._store_refs [id (store )]=self ._store_refs .get (id (store ),0 )+1 
+            return store 
+
+    def _release_store (self ,store :VectorStore ):
+        """Вернуть хранилище; замененное закрывается после последнего запроса"""
+        with self ._swap_lock :
+            refs =self ._store_refs [id (store )]-1 
+            if refs :
+                self ._store_refs [id (store )]=refs 
+                return 
+
+            del self ._store_refs [id (store )]
+            if store in self ._retired_stores :
+                self ._retired_stores .remove (store )
+                store .close ()
+
     def ask (self ,question :str ,verbose :bool =False )->Dict :
         """Задать вопрос системе"""
 
 
+        self .refresh_index ()
+
         if verbose :
             print ("🔍 Ищу релевантную информацию...")
         query_embedding =self .embedder .embed (question )
 
 
 
-        results =self .store .search (query_embedding ,top_k =TOP_K )
+        store =self ._acquire_store ()
+        try :
+            results =store .search (query_embedding ,top_k =TOP_K )
+        finally :
+            self ._release_store (store )
 
 
         relevant_docs =[]
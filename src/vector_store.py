@@ -1,17 +1,69 @@
 import chromadb 
-from typing import List ,Dict 
-from config import DB_DIR 
+from chromadb .api .client import SharedSystemClient 
+from pathlib import Path 
+from typing import List ,Dict ,Optional 
+from config import (
+DB_DIR ,COLLECTION_NAME ,COMPRESSION_SHORTLIST ,
+HNSW_SPACE ,HNSW_M ,HNSW_CONSTRUCTION_EF ,HNSW_SEARCH_EF ,HNSW_BATCH_SIZE ,HNSW_SYNC_THRESHOLD 
+)
+from src .compression import CompressedIndex 
+
+
+def hnsw_metadata (
+m :int =HNSW_M ,
+construction_ef :int =HNSW_CONSTRUCTION_EF ,
+search_ef :int =HNSW_SEARCH_EF ,
+batch_size :int =HNSW_BATCH_SIZE ,
+sync_threshold :int =HNSW_SYNC_THRESHOLD 
+)->Dict :
+    """Параметры HNSW в формате метаданных коллекции Chroma"""
+    return {
+    "hnsw:space":HNSW_SPACE ,
+    "hnsw:M":m ,
+    "hnsw:construction_ef":construction_ef ,
+    "hnsw:search_ef":search_ef ,
+    "hnsw:batch_size":batch_size ,
+    "hnsw:sync_threshold":max (sync_threshold ,batch_size )
+    }
 
 
 class VectorStore :
     """Векторное хранилище для поиска по эмбеддингам"""
 
-    def __init__ (self ):
-        self .client =chromadb .PersistentClient (path =str (DB_DIR ))
+    def __init__ (self ,path :Optional [Path ]=None ):
+        self .path =Path (path )if path is not None else DB_DIR 
+        self .client =chromadb .PersistentClient (path =str (self .path ))
+        self .collection =None 
+        self .compressed =None 
+        self .search_ef =None 
+
+    def close (self ):
+        """
+        Освободить ресурсы базы. Chroma кэширует System (sqlite, загруженный
+        HNSW) по пути базы на всё время жизни процесса, поэтому его нужно
+        убрать из кэша и остановить явно.
+        """
+        if self .client is None :
+            return 
+
         self .collection =None 
+        self .compressed =None 
+
+        system =self .client ._system 
+        self .client =None 
+        identifier =SharedSystemClient ._get_identifier_from_settings (system .settings )
+        cache =getattr (SharedSystemClient ,"_identifier_to_system",None )
+        if cache is None :
+            cache =getattr (SharedSystemClient ,"_identifer_to_system",{})
+        if cache .get (identifier )is system :
+            del cache [identifier ]
+        system .stop ()
 
-    def create_collection (self ,name :str ="egov_docs"):
-        """Создать или получить коллекцию"""
+    def create_collection (self ,name :str =COLLECTION_NAME ,**hnsw_params ):
+        """
+        Создать коллекцию. Параметры HNSW (m, construction_ef, search_ef,
+        batch_size, sync_threshold) берутся из config.py, если не переданы явно.
+        """
         try :
             self .client .delete_collection (name )
         except :
@@ -19,16 +71,21 @@ class VectorStore :
 
         self .collection =self .client .create_collection (
         name =name ,
-        metadata ={"hnsw:space":"cosine"}
+        metadata =hnsw_metadata (**hnsw_params )
         )
+        self .search_ef =self .collection .metadata .get ("hnsw:search_ef")
         print (f"✅ Коллекция '{name}' создана")
 
-    def load_collection (self ,name :str ="egov_docs"):
+    def load_collection (self ,name :str =COLLECTION_NAME ):
         """Загрузить существующую коллекцию"""
         self .collection =self .client .get_collection (name )
         count =self .collection .count ()
         print (f"✅ Загружена коллекция: {count} документов")
 
+        if CompressedIndex .exists (self .path ):
+            self .compressed =CompressedIndex .load (self .path )
+            print ("✅ Загружен сжатый индекс векторов")
+
     def add_documents (self ,texts :List [str ],embeddings :List [List [float ]],metadatas :List [Dict ]):
         """Добавить документы в хранилище"""
         ids =[f"doc_{i}"for i in range (len (texts ))]
@@ -41,11 +98,61 @@ class VectorStore :
         )
         print (f"✅ Добавлено {len(texts)} документов")
 
-    def search (self ,query_embedding :List [float ],top_k :int =5 )->Dict :
-        """Поиск похожих документов"""
+    def build_compressed_index (self ,embeddings :List [List [float ]])->CompressedIndex :
+        """Построить сжатый индекс для первичного отбора и сохранить рядом с базой"""
+        index =CompressedIndex .fit (embeddings )
+        index .save (self .path )
+        self .compressed =CompressedIndex .load (self .path )
+
+        stats =index .memory_stats ()
+        print (f"✅ Сжатый индекс: {stats['compressed_bytes']/1024:.0f} КБ вместо {stats['full_bytes']/1024:.0f} КБ")
+        return index 
+
+    def set_search_ef (self ,search_ef :int ):
+        """
+        Изменить глубину поиска HNSW у коллекции без пересборки. Значение
+        сохраняется в базе, а уже загруженный индекс его не видит, поэтому
+        клиент переоткрывается.
+        """
+        if search_ef ==self .search_ef :
+            return 
+
+        name =self .collection .name 
+        self .collection .modify (configuration ={"hnsw":{"ef_search":search_ef }})
+
+        self .close ()
+        self .client =chromadb .PersistentClient (path =str (self .path ))
+        self .load_collection (name )
+        self .search_ef =search_ef 
+
+    def validate (self ,expected_count :int ,probe_embedding :List [float ])->bool :
+        """Проверить собранную коллекцию перед публикацией"""
+        count =self .collection .count ()
+        if count !=expected_count :
+            print (f"❌ Ожидалось {expected_count} документов, в коллекции {count}")
+            return False 
+
+        results =self .search (probe_embedding ,top_k =1 )
+        if not results ['documents']:
+            print ("❌ Пробный поиск не вернул результатов")
+            return False 
+
+        return True 
+
+    def search (self ,query_embedding :List [float ],top_k :int =5 ,shortlist :int =COMPRESSION_SHORTLIST ,
+    where :Optional [Dict ]=None )->Dict :
+        """
+        Поиск похожих документов. `shortlist` - размер списка кандидатов для
+        сжатого индекса, `where` - фильтр по метаданным (например, по source).
+        Глубина поиска HNSW (search_ef) задается для коллекции, а не для запроса.
+        """
+        if self .compressed is not None and where is None :
+            return self ._search_compressed (query_embedding ,top_k ,shortlist )
+
         results =self .collection .query (
         query_embeddings =[query_embedding ],
-        n_results =top_k 
+        n_results =top_k ,
+        where =where 
         )
 
         return {
@@ -53,3 +160,22 @@ class VectorStore :
         'metadatas':results ['metadatas'][0 ],
         'distances':results ['distances'][0 ]
         }
+
+    def _search_compressed (self ,query_embedding :List [float ],top_k :int ,shortlist :int )->Dict :
+        """Поиск по сжатому индексу; тексты и метаданные берутся из коллекции"""
+        indices ,distances =self .compressed .search (query_embedding ,top_k =top_k ,shortlist =shortlist )
+        ids =[f"doc_{i}"for i in indices ]
+        if not ids :
+            return {'documents':[],'metadatas':[],'distances':[]}
+
+        results =self .collection .get (ids =ids ,include =['documents','metadatas'])
+        by_id ={
+        doc_id :(doc ,metadata )
+        for doc_id ,doc ,metadata in zip (results ['ids'],results ['documents'],results ['metadatas'])
+        }
+
+        return {
+        'documents':[by_id [doc_id ][0 ]for doc_id in ids ],
+        'metadatas':[by_id [doc_id ][1 ]for doc_id in ids ],
+        'distances':distances 
+        }